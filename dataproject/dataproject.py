@@ -1,14 +1,16 @@
+import os
+import json
+import hashlib
 import pandas as pd
 import numpy as np
 import matplotlib.pyplot as plt
 import ipywidgets as widgets
-import json
 
 
 '''Importing data from Jobindsats JSON file'''
-with open('International Labor.json', 'r') as f:
-    int_data = json.load(f)
-int_lb = pd.DataFrame(int_data)
+# The file is a list of rows, which pandas reads directly into columns. We keep all columns as strings, so the
+# Danish thousands separator in the employment numbers is not mistaken for a decimal point.
+int_lb = pd.read_json('International Labor.json', orient='values', dtype=str)
 
 def clean_json_data(do_print = True):
     ''' Defining a callable function to use for cleaning our JSON data file '''
@@ -21,41 +23,40 @@ def clean_json_data(do_print = True):
 
     # As we've only extracted the data from 2014 and after, we do not need to drop any time-dependent variables.
     # First, we don't need the second and last column, so we drop these:
-    int_lb_copy.drop(1, axis=1, inplace=True)
-    int_lb_copy.drop(4, axis=1, inplace=True)
+    int_lb_copy.drop(columns=[1, 4], inplace=True)
 
     # The columns are currently named 0,1,...,4. This doesn't say a lot, so we rename all columns:
-    int_lb_copy.rename(columns = {0:'time'}, inplace=True)
-    int_lb_copy.rename(columns= {2:'industry'}, inplace=True)
-    int_lb_copy.rename(columns={3:'int_empl'}, inplace=True)
+    int_lb_copy.rename(columns={0:'time', 2:'industry', 3:'int_empl'}, inplace=True)
 
     # Our observations for international employment are currently in the 'string' format. We want them to be numbers.
     string_empl = int_lb_copy['int_empl']
 
     # All our observations are written as Danish 1000, e.g. 2.184 which is supposed to be 2184 and not decimals. 
-    # The '.' means we can't convert the numbers directly to integers so we remove this and then convert to intergers.
-    inter_empl = string_empl.str.replace('.', '').astype(int)
+    # The '.' means we can't convert the numbers directly to integers so we remove this and then convert to the smallest fitting integer type.
+    inter_empl = pd.to_numeric(string_empl.str.replace('.', '', regex=False), downcast='integer')
     
     # Lastly, we replace the string format of the original series and replace it with the new integer series:
     int_lb_copy['int_empl'] = inter_empl
 
     # We would like to sort our data by time. To be able to do so, we convert the 'time' variable into datetime variables.
-    # All our variables are in the format 'month, year' but in Danish. So we need to translate the 'Time' values from Danish to English
-    int_lb_copy['time'] = int_lb_copy['time'].str.replace("Maj", "May")
-    int_lb_copy['time'] = int_lb_copy['time'].str.replace("Okt", "Oct")
-    # Now we can convert our 'Time' variable into a datetime_variable.
-    int_lb_copy['time'] = pd.to_datetime(int_lb_copy['time'], format='%b %Y')
+    # All our variables are in the format 'month year' but with Danish month abbreviations. We split the month from the year and
+    # look up the month number, so we can build the datetime variables directly from the numbers without parsing the strings.
+    months = {'Jan':1, 'Feb':2, 'Mar':3, 'Apr':4, 'Maj':5, 'Jun':6, 'Jul':7, 'Aug':8, 'Sep':9, 'Okt':10, 'Nov':11, 'Dec':12}
+    month_year = int_lb_copy['time'].str.split(' ', n=1, expand=True)
+    int_lb_copy['time'] = pd.to_datetime(pd.DataFrame({'year': month_year[1].astype(int), 'month': month_year[0].map(months), 'day': 1}))
 
     # The industries are also still in Danish, so we rename to English and in line with our data from DST:
-    int_lb_copy['industry'] = int_lb_copy['industry'].str.replace('Andre serviceydelser  mv.', 'other_services')
-    int_lb_copy['industry'] = int_lb_copy['industry'].str.replace('Ejendomshandel og udlejning', 'real_estate')
-    int_lb_copy['industry'] = int_lb_copy['industry'].str.replace('Finansiering og forsikring', 'finance_insurance')
-    int_lb_copy['industry'] = int_lb_copy['industry'].str.replace('Hoteller og restauranter', 'hotels_restaurants')
-    int_lb_copy['industry'] = int_lb_copy['industry'].str.replace('Information og kommunikation', 'information_communication')
-    int_lb_copy['industry'] = int_lb_copy['industry'].str.replace('Kultur og fritid', 'culture_leisure')
-    int_lb_copy['industry'] = int_lb_copy['industry'].str.replace('Rejsebureau, rengøring o.a. operationel service', 'cleaning_etc')
-    int_lb_copy['industry'] = int_lb_copy['industry'].str.replace('Transport', 'transport')
-    int_lb_copy['industry'] = int_lb_copy['industry'].str.replace('Videnservice', 'research_consultancy')
+    int_lb_copy['industry'] = int_lb_copy['industry'].replace({
+        'Andre serviceydelser  mv.':'other_services',
+        'Ejendomshandel og udlejning':'real_estate',
+        'Finansiering og forsikring':'finance_insurance',
+        'Hoteller og restauranter':'hotels_restaurants',
+        'Information og kommunikation':'information_communication',
+        'Kultur og fritid':'culture_leisure',
+        'Rejsebureau, rengøring o.a. operationel service':'cleaning_etc',
+        'Transport':'transport',
+        'Videnservice':'research_consultancy',
+        })
 
     # We sort through the data by time.
     int_lb_cleaned = int_lb_copy.sort_values(by='time')
@@ -64,7 +65,7 @@ def clean_json_data(do_print = True):
         print(f'Before cleaning, the JSON datafile from JobIndsats contains {int_lb.shape[0]} observations and {int_lb.shape[1]} variables.')    
         print('We have removed two columns and renamed the remaining.')
         print(f'The dataset now contains {int_lb_copy.shape[0]} observations and {int_lb_copy.shape[1]} variables.')
-        print(f'All our observations are of type: {type(string_empl[0])}. We want them to be integers - we use the as.type method.')
+        print(f'All our observations are of type: {type(string_empl[0])}. We want them to be integers - we use the pd.to_numeric method.')
         print(f'The observations are now of type: {type(inter_empl[0])} and the first observation is: {inter_empl[0]}')
         print('We would like to sort the data by time, so we convert our time Variable into datetime variables.')
         print('All our industries are in Danish, so we rename them to English.')
@@ -75,26 +76,27 @@ def clean_json_data2():
     ''' Defining a callable function to use for further cleaning JSON data file '''
     int_lb = clean_json_data()
     print('For the purpose of our analysis, we want to convert the DataFrame into a pivot table, so that the data is easier to work with.')
-    print('We do so using the .pivot method, using time as index, industries as columns and international labor as our observations.')
-    int_lb_pivot = int_lb.pivot(index='time', columns='industry', values='int_empl')
+    print('We do so by grouping on time and industry and unstacking the industries, using time as index, industries as columns and international labor as our observations.')
+    # Grouping on the integer codes of a categorical industry column is cheaper than on the strings, and with observed=True
+    # the unstack only reindexes the industries that are in the data
+    int_lb['industry'] = int_lb['industry'].astype('category')
+    int_lb_pivot = (int_lb.groupby(['time', 'industry'], observed=True, sort=True)['int_empl']
+                    .sum()
+                    .unstack('industry', fill_value=0))
     
     # The dataset on the service industry from DST conatins the totalt and 7 sub-industries.
     # Our dataset above contains 9 sub-industries but not the total. 
-    # We therefor need to add all observations togteher to create the total:
+    # We therefor need to add all observations togteher to create the total.
+    # For our data to be in line with the data from DST, we also need to combine some of the industries:
+    # 'finance and insurance' with 'real estate', and 'culture and leisure' with 'other services'.
+    # The new columns are added and the combined industries dropped in one chain.
     print('For our dataset to match the data from DST, we sum over all industries to get the total and combine four of the industires so that they match')
-    int_lb_pivot['total'] = int_lb_pivot.sum(axis=1)
-
-    # For our data to be in line with the data from DST, we need to combine some of the industries.
-    # We combine the observations of 'finance and insurance' with 'real estate':
-    int_lb_pivot['finance_real_estate'] = int_lb_pivot['finance_insurance'] + int_lb_pivot['real_estate']
-    # We combine the observations of 'culture and leisure' with 'other services':
-    int_lb_pivot['culture_leisure_other'] = int_lb_pivot['other_services'] + int_lb_pivot['culture_leisure']
-
     print('Lastly, we drop the industries, that we have just combined to make new ones.')
-    int_lb_pivot.drop('finance_insurance', axis=1, inplace=True)
-    int_lb_pivot.drop('real_estate', axis=1, inplace=True)
-    int_lb_pivot.drop('other_services', axis=1, inplace=True)
-    int_lb_pivot.drop('culture_leisure', axis=1, inplace=True)
+    int_lb_pivot = int_lb_pivot.assign(
+        total=int_lb_pivot.sum(axis=1),
+        finance_real_estate=lambda d: d['finance_insurance'] + d['real_estate'],
+        culture_leisure_other=lambda d: d['other_services'] + d['culture_leisure'],
+        ).drop(columns=['finance_insurance', 'real_estate', 'other_services', 'culture_leisure'])
 
     print(f'The cleaned dataset now contains 8 columns (industries) and {int_lb_pivot.shape[0]} observations')
 
@@ -104,8 +106,6 @@ def clean_json_data2():
 def clean_dst_empl(employees):
     ''' Defining a callable function to use for cleaning our data from DST ''' 
     print(f'Since we have extracted all the data from the source on DST, we need to select only the variables that are relevant for our analysis')
-    
-    params = employees._define_base_params(language='en')
 
     print(f'For the employment data, we first define our parameters so that we get only data from january 2014 to january 2024 and only for the total of industries.')
     params = {'table': 'LBESK03',
@@ -115,7 +115,15 @@ def clean_dst_empl(employees):
     {'code': 'Tid', 'values': ['>2013M12<=2024M01']}]}
 
     print(f'Then, we retract the parameters we defined, into our DataFrame, drop the industry since we do not need to split the data on industry, and rename the columns to english, simple titles.')
-    empl = employees.get_data(params=params)
+    # The data is stored on disk the first time it is fetched, so later runs with the same parameters skip the call to DST.
+    key = hashlib.md5(json.dumps(params, sort_keys=True).encode()).hexdigest()
+    path = os.path.join('.cache', f'dst_{key}.parquet')
+    if os.path.exists(path):
+        empl = pd.read_parquet(path)
+    else:
+        empl = employees.get_data(params=params)
+        os.makedirs('.cache', exist_ok=True)
+        empl.to_parquet(path, compression='zstd')
     empl.drop(['BRANCHEDB071038'], axis=1, inplace=True)
     empl.rename(columns = {'INDHOLD':'employees', 'TID':'time'}, inplace=True)
     empl['time'] = pd.to_datetime(empl['time'], format='%YM%m')
@@ -292,7 +300,6 @@ def merging_datasets(int_labor,empl_industry):
     # We use the inner-merge method on both the time and industry variables because: 
     # 1) while both data frames are sorted by the time variables, the industries are not in the same order. We therefore merge on both these variables, to make sure the corresponding values of total and international employment match,
     # 2) Even though both datasets contains the same time variable and industry variable, we do not want to risk ending up with missing variables, in case any of the datasets have observations of 0.
-    inner.sort_values(by='time')
     print('Merge succesfull, the dataset now contains data on both total amount of employees and international employees')
     display(inner.head(5))
     print(f'Industries in the merged dataset: {inner.industry.unique()}, total = {len(inner.industry.unique())}')
@@ -1,7 +1,15 @@
 import numpy as np
+import pandas as pd
 import matplotlib.pyplot as plt
 from types import SimpleNamespace
 from scipy import optimize
+from numba import njit, prange
+
+@njit(cache=True)
+def _labor_foc(l, w, m, nu, epsilon):
+    ''' First-order condition of the consumer for labor supply l and non-labor income m, compiled so the root finder can call it cheaply.
+    Both c1 and c2 are proportional to the income w*l + m, so the marginal utility of labor is w/(w*l + m). '''
+    return w/(w*l + m) - nu * l**epsilon
 
 class ProductionEconomy:
 
@@ -24,55 +32,63 @@ class ProductionEconomy:
         # Question 3
         par.kappa = 0.1
 
-    def firm1(self, p1, w):
+    def firm(self, p, w):
         par = self.par
-        # Defining labor for firm 1 with inputs p1 and w and given parameters
-        l1 = (p1*par.A * par.gamma/w) ** (1/(1-par.gamma))
-        y1 = par.A * (l1 ** par.gamma)
+        # Defining labor for a firm with inputs p and w and given parameters. The two firms share the same technology,
+        # so this is used for firm 1 with p1 and firm 2 with p2, for single prices as well as arrays of prices
+        l = (p*par.A * par.gamma/w) ** (1/(1-par.gamma))
+        y = par.A * (l ** par.gamma)
         
-        return l1, y1
+        return l, y
     
-    def imp_profit1(self, p1, w):
+    def imp_profit(self, p, w):
         par = self.par
-        # Defining the implied profits for firm 1 with inputs p1 and w and given parameters
-        pi1 = ((1-par.gamma)*w/par.gamma) * (p1*par.A*par.gamma/w)**(1/(1-par.gamma))
+        # Defining the implied profits for a firm with inputs p and w and given parameters
+        pi = ((1-par.gamma)*w/par.gamma) * (p*par.A*par.gamma/w)**(1/(1-par.gamma))
 
-        return pi1
-    
-    def firm2(self, p2, w):
-        par = self.par
-        # Defining labor for firm 2 with inputs p2 and w and given parameters
-        l2 = (p2*par.A * par.gamma/w) ** (1/(1-par.gamma))
-        y2 = par.A * (l2 ** par.gamma)
-        
-        return l2, y2
+        return pi
     
-    def imp_profit2(self, p2, w):
+    def labor_supply(self,p1,p2,w):
+        ''' Defining the consumer's optimal labor supply, given prices p1, p2, and wage w. Also works for arrays of prices '''
         par = self.par
-        # Defining the implied profits for firm 2 with inputs p2 and w and given parameters
-        pi2 = ((1-par.gamma)*w/par.gamma) * (p2*par.A*par.gamma/w)**(1/(1-par.gamma))
 
-        return pi2
-    
+        # Non-labor income from the implied profits of firm 1 and 2 and the transfer
+        m = par.T + self.imp_profit(p1,w) + self.imp_profit(p2,w)
+
+        # The first-order condition of the utility function is w/(w*l + m) = nu*l^epsilon.
+        # The left-hand side is decreasing and the right-hand side increasing in l, so there is a unique solution,
+        # which lies between 0 and nu^(-1/(1+epsilon)).
+        l_max = par.nu**(-1/(1+par.epsilon))
+
+        if par.epsilon == 1:
+            # With epsilon = 1 the condition is the quadratic nu*w*l^2 + nu*m*l - w = 0, and we take the positive root
+            return (-par.nu*m + np.sqrt((par.nu*m)**2 + 4*par.nu*w**2)) / (2*par.nu*w)
+
+        if np.ndim(m) == 0:
+            # For a single set of prices we find the root with Brent's method
+            return optimize.brentq(_labor_foc, 1e-12, 2*l_max, args=(w, m, par.nu, par.epsilon))
+
+        # For arrays of prices we find all roots at once by bisection
+        lo = np.zeros(np.shape(m))
+        hi = np.full(np.shape(m), l_max)
+        for _ in range(60):
+            mid = (lo + hi) / 2
+            foc = w/(w*mid + m) - par.nu * mid**par.epsilon
+            lo = np.where(foc > 0, mid, lo)
+            hi = np.where(foc > 0, hi, mid)
+
+        return (lo + hi) / 2
+
     def consumer_behavior(self,p1,p2,w):
         ''' Defining the consumer's behavior, given prices p1, p2, and wage w '''
         par = self.par
 
-        # Extracting implied profits for firm 1 and 2 from previous functions
-        pi1 = self.imp_profit1(p1,w)
-        pi2 = self.imp_profit2(p2,w)
+        # Extracting implied profits for firm 1 and 2 from the previous function
+        pi1 = self.imp_profit(p1,w)
+        pi2 = self.imp_profit(p2,w)
 
-        def utility(l):
-            ''' Defining the utility function as a function of c1 and c2'''
-            c1 = par.alpha * (w*l + par.T + pi1 + pi2) / p1
-            c2 = (1-par.alpha) * (w*l + par.T + pi1 + pi2) / (p2 + par.tau)
-            return np.log(c1**par.alpha * c2**(1-par.alpha)) - par.nu * l**(1+par.epsilon) / (1+par.epsilon)
-        
-        # Calling an optimi<er to find the optimal labor supply and through that consumption
-        sol = optimize.minimize(lambda l: -utility(l), x0=0, method='SLSQP', bounds=[(0,None)])
-
-        # results of our optimization:
-        l_star = sol.x[0]
+        # The optimal labor supply follows from the first-order condition, and through that consumption
+        l_star = self.labor_supply(p1,p2,w)
         c1_star = par.alpha * (w*l_star + par.T + pi1 + pi2) / p1
         c2_star = (1-par.alpha) * (w*l_star + par.T + pi1 + pi2) / (p2 + par.tau)
 
@@ -84,8 +100,8 @@ class ProductionEconomy:
         # Extracting optimal labor supply and consumption for consumer
         l_star, c1_star, c2_star = self.consumer_behavior(p1,p2,w)
         # Extracting optimal labor supply and production for firm 1 and 2
-        l1_star, y1_star = self.firm1(p1,w)
-        l2_star, y2_star = self.firm2(p2,w)
+        l1_star, y1_star = self.firm(p1,w)
+        l2_star, y2_star = self.firm(p2,w)
 
         # Calculating the excess demand for the different markets
         exc_labor = l_star - l1_star - l2_star
@@ -95,34 +111,40 @@ class ProductionEconomy:
         return exc_labor, exc_good1, exc_good2
      
     def check_market_clearing(self, p1_values, p2_values, w):
-        ''' Defining a callable function, which loops through a set of p1 and p2 values to check market clearing conditions'''
-
-        # Define a for loop for all values of p1 and p2
-        for p1 in p1_values:
-            for p2 in p2_values:
-                try:
-                    l_star, c1_star, c2_star = self.consumer_behavior(p1, p2, w)
-                    l1_star, y1_star = self.firm1(p1, w)
-                    l2_star, y2_star = self.firm2(p2, w)
-
-                    # We check if the labor market clears by checking if supply and demand is equal/close to equal
-                    labor_market_clearing = np.isclose(l_star, l1_star + l2_star)
-                    # Using same approach for the markets of good 1 and 2
-                    good1_market_clearing = np.isclose(c1_star, y1_star)
-                    good2_market_clearing = np.isclose(c2_star, y2_star)
-
-                except Exception as e:
-                    # Implementing an exception to catch any potential errors in our code/implementation
-                    print(f"Error for p1={p1}, p2={p2}: {e}")
-                    continue
-                
-                
-        if labor_market_clearing and good1_market_clearing and good2_market_clearing:
-            print(f'For p1={p1:2f} and p2={p2:.2f} the markets clears.\n excess demand for: labor = {labor_market_clearing}, good1 = {good1_market_clearing}, good2 = {good2_market_clearing}\n')
+        ''' Defining a callable function, which checks the market clearing conditions for all combinations of p1 and p2 values'''
+        par = self.par
+
+        # Setting up a grid of all combinations of p1 and p2, so every market is evaluated for all prices at once
+        P1, P2 = np.meshgrid(p1_values, p2_values, indexing='ij')
+
+        # Optimal labor supply and consumption for the consumer
+        l_star, c1_star, c2_star = self.consumer_behavior(P1, P2, w)
+
+        # Optimal labor demand and production for firm 1 and 2
+        l1_star, y1_star = self.firm(P1, w)
+        l2_star, y2_star = self.firm(P2, w)
+
+        # We check if the labor market clears by checking if supply and demand is equal/close to equal
+        labor_market_clearing = np.isclose(l_star, l1_star + l2_star)
+        # Using same approach for the markets of good 1 and 2
+        good1_market_clearing = np.isclose(c1_star, y1_star)
+        good2_market_clearing = np.isclose(c2_star, y2_star)
+
+        results = pd.DataFrame({
+            'p1': P1.ravel(),
+            'p2': P2.ravel(),
+            'labor': labor_market_clearing.ravel(),
+            'good1': good1_market_clearing.ravel(),
+            'good2': good2_market_clearing.ravel()})
+
+        clears = results[results['labor'] & results['good1'] & results['good2']]
+        if len(clears) > 0:
+            for p1, p2 in zip(clears['p1'], clears['p2']):
+                print(f'For p1={p1:.2f} and p2={p2:.2f} all three markets clear.')
         else:
             print(f'Found no combination of p1 and p2, which clears all three markets.')
 
-        return
+        return results
     
     def find_equilibrium_prices(self, w):
         ''' Defining callable function to find any equilibirum prices '''
@@ -132,16 +154,37 @@ class ProductionEconomy:
         def obj_p(prices):
             p1, p2 = prices
             # We use Walras' Law, meaning we only neew to clear two of the markets, to find the equilibrium prices
-            exc_labor, exc_good1 = self.market_error(p1, p2, w)[0], self.market_error(p1, p2, w)[1]
-            total_excess = exc_labor, exc_good1
-            return total_excess
+            exc_labor, exc_good1, exc_good2 = self.market_error(p1, p2, w)
+            return np.array([exc_labor, exc_good1])
+
+        def jac_p(prices):
+            p1, p2 = prices
+            # Derivatives of labor demand, production and implied profits of each firm with respect to its own price
+            l1_star, y1_star = self.firm(p1, w)
+            l2_star, y2_star = self.firm(p2, w)
+            dl1 = l1_star / ((1-par.gamma)*p1)
+            dl2 = l2_star / ((1-par.gamma)*p2)
+            dy1 = par.gamma*y1_star / ((1-par.gamma)*p1)
+            dpi1 = w*l1_star / (par.gamma*p1)
+            dpi2 = w*l2_star / (par.gamma*p2)
+
+            # Prices only affect the consumer through the non-labor income m. By the implicit function theorem on the
+            # first-order condition w/(w*l + m) = nu*l^epsilon, we get the response of the labor supply to m
+            l_star = self.labor_supply(p1, p2, w)
+            income = w*l_star + par.T + self.imp_profit(p1, w) + self.imp_profit(p2, w)
+            dl_dm = -(w/income**2) / (w**2/income**2 + par.nu*par.epsilon*l_star**(par.epsilon-1))
+            dincome_dm = 1 + w*dl_dm
+
+            return np.array([
+                [dl_dm*dpi1 - dl1, dl_dm*dpi2 - dl2],
+                [par.alpha*(dincome_dm*dpi1/p1 - income/p1**2) - dy1, par.alpha*dincome_dm*dpi2/p1]])
         
         print(f'Using Walras Law, clearing the markets for labor and good 1, to find equilibrium prices for a given wage w={w}')
         print(f'Initial guess of (p1, p2): {initial_guess}.\n Initial excess demand for labor: {obj_p(initial_guess)[0]:.3f}, good 1: {obj_p(initial_guess)[1]:.3f}\n')
         print(f'Finding equilibrium prices...\n ...\n')
         
         try:
-            result = optimize.root(obj_p, initial_guess, method='hybr')
+            result = optimize.root(obj_p, initial_guess, jac=jac_p, method='hybr')
             # We use the root finder, to find where excess demand is 0
             if result.success:
                 # If an equilibirum exists, the following is printed:
@@ -163,7 +206,7 @@ class ProductionEconomy:
 
         # Exctracting previous results
         l_star, c1_star, c2_star = self.consumer_behavior(p1, p2, w)
-        y2_star = self.firm2(p2, w)[1]
+        y2_star = self.firm(p2, w)[1]
         utility = np.log(c1_star**par.alpha * c2_star**(1-par.alpha)) - par.nu * l_star**(1+par.epsilon) / (1+par.epsilon)
 
         def obj_soc(tau):
@@ -184,6 +227,53 @@ class ProductionEconomy:
         return social_sol.x
 
     
+@njit(parallel=True, cache=True)
+def _simulate_kernel(EU, noise):
+    ''' Picks the career with the highest expected utility for each type of graduate and instance, in parallel over the K instances.
+    EU has shape (N,K,J) and noise has shape (N,K). '''
+    N, K, J = EU.shape
+    career = np.empty((N, K), dtype=np.int8)
+    EV = np.empty((N, K))
+    RV = np.empty((N, K))
+    for k in prange(K):
+        for i in range(N):
+            best = 0
+            for j in range(1, J):
+                if EU[i, k, j] > EU[i, k, best]:
+                    best = j
+            career[i, k] = best + 1
+            EV[i, k] = EU[i, k, best]
+            RV[i, k] = best + 1 + noise[i, k]
+    return career, EV, RV
+
+@njit(parallel=True, cache=True)
+def _career_alt_kernel(EU, noise, career, RV, c):
+    ''' Picks between staying in the original career, with its realized utility, and switching to another career, with its new expected
+    utility minus the switching cost c, in parallel over the K instances. EU has shape (N,K,J), the other arrays have shape (N,K). '''
+    N, K, J = EU.shape
+    switch = np.empty((N, K), dtype=np.int8)
+    career_alt = np.empty((N, K), dtype=np.int8)
+    EV_alt = np.empty((N, K))
+    RV_alt = np.empty((N, K))
+    for k in prange(K):
+        for i in range(N):
+            best = 0
+            best_val = -np.inf
+            for j in range(J):
+                val = RV[i, k] if j + 1 == career[i, k] else EU[i, k, j] - c
+                if val > best_val:
+                    best = j
+                    best_val = val
+            career_alt[i, k] = best + 1
+            EV_alt[i, k] = best_val
+            if best + 1 == career[i, k]:
+                switch[i, k] = 0
+                RV_alt[i, k] = RV[i, k]
+            else:
+                switch[i, k] = 1
+                RV_alt[i, k] = best + 1 - c + noise[i, k]
+    return switch, career_alt, EV_alt, RV_alt
+
 class CareerChoice:
     def __init__(self, seed=None):
         '''Initializes the parameters of the model'''
@@ -195,15 +285,15 @@ class CareerChoice:
         par.v = np.array([1,2,3])
         par.c = 1
 
-        if seed is not None:
-            np.random.seed(seed)
-        self.seed = seed      
+        # a single random number generator is used for all draws in the model
+        self.seed = seed
+        self.rng = np.random.default_rng(seed)
 
     def epsdraw(self, size):
         '''Draws epsilon from a normal distribution with mean 0 and standard deviation sigma.
         Changes seed based on input.'''
         par = self.par
-        eps= np.random.normal(loc=0, scale=par.sigma, size=size)
+        eps = self.rng.standard_normal(size) * par.sigma
         return eps
   
 
@@ -216,268 +306,67 @@ class CareerChoice:
             utility.append(v + np.mean(self.epsdraw(par.K)))
         return utility
 
-    def v1(self):
-        '''Calculates the expected utility of career choice v1 for each type of graduate'''
-        par = self.par
-        # creating an empty list to store the expected utility for each type of graduate
-        EU = []
-        # creating a for loop to loop over each type of graduate
-        for i in range(1,par.N+1):
-            # drawing noise terms from the given normal distribution
-            # the size of the noise term is equal to numer of friends for each graduate
-            eps = np.random.normal(loc=0, scale=par.sigma, size=i)
-            eu = 1/i*(1*i + eps.sum())
-            EU.append(eu)
-        return EU
-    
-    def v2(self):
-        '''Calculates the expected utility of career choice v2 for each type of graduate'''
-        # same approach as for v1
-        par = self.par
-        EU = []
-        for i in range(1,par.N+1):
-            eps = np.random.normal(loc=0, scale=par.sigma, size=i)
-            eu = 1/i*(2*i + eps.sum())
-            EU.append(eu)
-        return EU 
-
-    def v3(self):
-        '''Calculates the expected utility of career choice v3 for each type of graduate'''
-        # same approach as for v1
+    def EU_all(self, K=None):
+        '''Calculates the expected utility of each career choice for each type of graduate, as an (N,J) array.
+        If K is given, K independent instances are drawn at once and the result is an (N,K,J) array.'''
         par = self.par
-        EU = []
-        for i in range(1,par.N+1):
-            eps = np.random.normal(loc=0, scale=par.sigma, size=i)
-            eu = 1/i*(3*i + eps.sum())
-            EU.append(eu)
+        shape = (par.N, par.J) if K is None else (par.N, K, par.J)
+        # drawing a noise term from the given normal distribution for each friend and career.
+        # graduate type i has i friends, so their expected utility is v_j plus the average of the first i noise terms
+        eps = self.rng.standard_normal(shape) * par.sigma
+        friends = np.arange(1, par.N+1).reshape((par.N,) + (1,)*(len(shape)-1))
+        EU = par.v + np.cumsum(eps, axis=0) / friends
         return EU
     
     def career(self):
-        '''Looping over each type of graduate end sorting them into the career with the highest expected utility.'''
+        '''Sorting each type of graduate into the career with the highest expected utility.'''
         par = self.par
-        # calling the expected utility functions for each career choice, getting 10 random instances for each
+        # calling the expected utility function, getting a random instance of each career choice for each
         # type of graduate
-        EUv1 = self.v1()
-        EUv2 = self.v2()
-        EUv3 = self.v3()
-
-        #creating empty lists to store the results in the correct order
-        career = []
-        EV = []
-        noiseterm = []
-        RV = []
-
-        # looping over each type of graduate
-        for i in range(0,par.N):
-            # choosing the career with the highest expected utility for each type of graduate
-            choice = np.max([EUv1[i], EUv2[i], EUv3[i]])
-            # if the choice is v1, add v1 = 1 to carrer list as well as the associated expected utility and a new noise term
-            # that needs to be used for the realized utility of choosing the given career
-            if choice == EUv1[i]:
-                career.append(1)
-                EV.append(EUv1[i])
-                noise = np.random.normal(loc=0, scale=par.sigma, size=1)
-                noiseterm.append(noise[0])
-            # in the same manner, proceed if the choice is v2 or v3
-            elif choice == EUv2[i]:
-                career.append(2)
-                EV.append(EUv2[i])
-                noise = np.random.normal(loc=0, scale=par.sigma, size=1)
-                noiseterm.append(noise[0])
-            else:
-                career.append(3)
-                EV.append(EUv3[i])
-                noise = np.random.normal(loc=0, scale=par.sigma, size=1)
-                noiseterm.append(noise[0])
-        
-        # looping over each type of graduate, we calculate the realized utility by adding the noise term
-        # to the base value, v_j, associated with the career they chose
-        for i in range(0,par.N):
-            RV.append(career[i] + noiseterm[i])
+        EU = self.EU_all()
+
+        # choosing the career with the highest expected utility for each type of graduate, and picking out the associated expected utility
+        choice = EU.argmax(axis=1)
+        career = choice + 1
+        EV = EU[np.arange(par.N), choice]
+
+        # we calculate the realized utility by adding a new noise term to the base value, v_j, associated with the career they chose
+        RV = career + self.rng.standard_normal(par.N) * par.sigma
         return career, EV, RV
     
     def simulate(self):
         '''Simulates the career choices for each type of graduate for K instances'''
         par = self.par
 
-        # creating empty dictionaries of career choice, expected utility and realized utility to store the results in correct order
-        careerdict = {
-            1: [],
-            2: [],
-            3: [],
-            4: [],
-            5: [],
-            6: [],
-            7: [],
-            8: [],
-            9: [],
-            10: []
-        }
-        EVdict = {
-            1: [],
-            2: [],
-            3: [],
-            4: [],
-            5: [],
-            6: [],
-            7: [],
-            8: [],
-            9: [],
-            10: []
-        }
-        RVdict = {
-            1: [],
-            2: [],
-            3: [],
-            4: [],
-            5: [],
-            6: [],
-            7: [],
-            8: [],
-            9: [],
-            10: []
-        }
-
-        # looping over each type of graduate and simulating the career choice for K instances
-        # for each loop, adding the K results to the corresponding dictionaries
-        for i in range(0,par.N):
-            n = 0
-            while n <= par.K:
-                career, EV, RV = self.career()
-                careerdict[i+1].append(career[i])
-                EVdict[i+1].append(EV[i])
-                RVdict[i+1].append(RV[i])
-                n += 1
+        # drawing the expected utilities for all K instances at once, for each type of graduate and each career
+        EU = self.EU_all(par.K)
+
+        # the realized utility adds a new noise term to the base value of the chosen career
+        noise = self.rng.standard_normal((par.N, par.K)) * par.sigma
+
+        # choosing the career with the highest expected utility for each type of graduate and instance.
+        # the results are stored in (N,K) arrays, where row i-1 holds the K instances for graduate type i
+        careerdict, EVdict, RVdict = _simulate_kernel(EU, noise)
 
         return careerdict, EVdict, RVdict   
 
     def career_alt(self, careerdict, RVdict):
         '''Simulates the career choices for each type of graduate for K instances, but with the possibility of switching career'''
         par = self.par
-        
-        # creating empty lists to sort and store correctly
-        switchdict = {
-            1: [],
-            2: [],
-            3: [],
-            4: [],
-            5: [],
-            6: [],
-            7: [],
-            8: [],
-            9: [],
-            10: []
-        }
-
-        careerdict_alt = {
-            1: [],
-            2: [],
-            3: [],
-            4: [],
-            5: [],
-            6: [],
-            7: [],
-            8: [],
-            9: [],
-            10: []
-        }
-
-        EVdict_alt = {
-            1: [],
-            2: [],
-            3: [],
-            4: [],
-            5: [],
-            6: [],
-            7: [],
-            8: [],
-            9: [],
-            10: []
-        }
-
-        RVdict_alt = {
-            1: [],
-            2: [],
-            3: [],
-            4: [],
-            5: [],
-            6: [],
-            7: [],
-            8: [],
-            9: [],
-            10: []
-        }
-
-        # looping over the 10,000 instances previously simulated for each of the 10 types of graduates 
-        for i in range(0,par.N):    
-            for n in range(0,par.K):
-                # after the graduates have been in their career for a year and the realized utility is known, they get the option
-                # to switch to a different career. If they do this, they draw three new noisy signals for the two careers they did not pick
-                EUv1 = self.v1()
-                EUv2 = self.v2()
-                EUv3 = self.v3()
-
-                # if the graduate chose career v1 originally, they must decide between sticking to their career or paying c = 1 to switch to one of the
-                # other careers based on their new drae of noisy signls. The same goes for the agents that picked the other two careers originally.
-                # for each choice, the corresponding values are appended into their respective dictionaries
-                # if the graduate chooses to switch, the variable added to switch will be a 1. If not, it will be a 0.
-                if careerdict[i+1][n] == 1:
-                    c = np.max([RVdict[i+1][n],(EUv2[i]-1), (EUv3[i]-1)])
-                    if c == RVdict[i+1][n]:
-                        careerdict_alt[i+1].append(1)
-                        EVdict_alt[i+1].append(RVdict[i+1][n])
-                        switchdict[i+1].append(0)
-                        RVdict_alt[i+1].append(RVdict[i+1][n])
-                    elif c == (EUv2[i]-1):
-                        careerdict_alt[i+1].append(2)
-                        EVdict_alt[i+1].append(EUv2[i]-1)
-                        switchdict[i+1].append(1)
-                        noise = np.random.normal(loc=0, scale=par.sigma, size=1)
-                        RVdict_alt[i+1].append(2 - 1 + noise)
-                    else: 
-                        careerdict_alt[i+1].append(3)
-                        EVdict_alt[i+1].append(EUv3[i]-1)
-                        switchdict[i+1].append(1)
-                        noise = np.random.normal(loc=0, scale=par.sigma, size=1)
-                        RVdict_alt[i+1].append(3 - 1 + noise)
-                elif careerdict[i+1][n] == 2:
-                    c = np.max([RVdict[i+1][n],(EUv1[i]-1), (EUv3[i]-1)])
-                    if c == RVdict[i+1][n]:
-                        careerdict_alt[i+1].append(2)
-                        EVdict_alt[i+1].append(RVdict[i+1][n])
-                        switchdict[i+1].append(0)
-                        RVdict_alt[i+1].append(RVdict[i+1][n])  
-                    elif c == (EUv1[i]-1):
-                        careerdict_alt[i+1].append(1)
-                        EVdict_alt[i+1].append(EUv1[i]-1)
-                        switchdict[i+1].append(1)
-                        noise = np.random.normal(loc=0, scale=par.sigma, size=1)
-                        RVdict_alt[i+1].append(1 - 1 + noise)
-                    else:
-                        careerdict_alt[i+1].append(3)
-                        EVdict_alt[i+1].append(EUv3[i]-1)
-                        switchdict[i+1].append(1)
-                        noise = np.random.normal(loc=0, scale=par.sigma, size=1)
-                        RVdict_alt[i+1].append(3 - 1 + noise)
-                else:
-                    c = np.max([RVdict[i+1][n],(EUv1[i]-1), (EUv2[i]-1)])
-                    if c == RVdict[i+1][n]:
-                        careerdict_alt[i+1].append(3)
-                        EVdict_alt[i+1].append(RVdict[i+1][n])
-                        switchdict[i+1].append(0)
-                        RVdict_alt[i+1].append(RVdict[i+1][n])
-                    elif c == (EUv1[i]-1):
-                        careerdict_alt[i+1].append(1)
-                        EVdict_alt[i+1].append(EUv1[i]-1)
-                        switchdict[i+1].append(1)
-                        noise = np.random.normal(loc=0, scale=par.sigma, size=1)
-                        RVdict_alt[i+1].append(1 - 1 + noise)
-                    else:
-                        careerdict_alt[i+1].append(2)
-                        EVdict_alt[i+1].append(EUv2[i]-1)
-                        switchdict[i+1].append(1)
-                        noise = np.random.normal(loc=0, scale=par.sigma, size=1)
-                        RVdict_alt[i+1].append(2 - 1 + noise)
+
+        # after the graduates have been in their career for a year and the realized utility is known, they get the option
+        # to switch to a different career. If they do this, they draw new noisy signals for the careers they did not pick.
+        # the new expected utilities are drawn for all K instances at once
+        EU = self.EU_all(par.K)
+
+        # graduates that switch draw a new noise term for the realized utility of their new career, net of the switching cost
+        noise = self.rng.standard_normal((par.N, par.K)) * par.sigma
+
+        # the value of each career is the known realized utility for the career originally chosen,
+        # and the new expected utility minus the switching cost c for the two other careers.
+        # each graduate picks the career with the highest value. If the graduate chooses to switch, 
+        # the switch variable will be a 1. If not, it will be a 0.
+        switchdict, careerdict_alt, EVdict_alt, RVdict_alt = _career_alt_kernel(EU, noise, careerdict, RVdict, float(par.c))
         
         return switchdict, careerdict_alt, EVdict_alt, RVdict_alt
             
@@ -485,168 +374,45 @@ class CareerChoice:
         '''Sorting the binary switch-variable based on which original career was chosen'''
         par = self.par
 
-        v1_original = {
-            1: [],
-            2: [],
-            3: [],
-            4: [],
-            5: [],
-            6: [],
-            7: [],
-            8: [],
-            9: [],
-            10: []
-        }
-
-        v2_original = {
-            1: [],
-            2: [],
-            3: [],
-            4: [],
-            5: [],
-            6: [],
-            7: [],
-            8: [],
-            9: [],
-            10: []
-        }
-
-        v3_original = {
-            1: [],
-            2: [],
-            3: [],
-            4: [],
-            5: [],
-            6: [],
-            7: [],
-            8: [],
-            9: [],
-            10: []
-        }
-        # looping over each graduate's 10,000 instances and sorting the square matrix of career choices based on the original career choice
-        for i in range(0,par.N):
-            for n in range(0,par.K):
-                if careerdict[i+1][n] == 1:
-                    if switchdict[i+1][n] == 1:
-                        v1_original[i+1].append(1)
-                    else:
-                        v1_original[i+1].append(0)
-                elif careerdict[i+1][n] == 2:
-                    if switchdict[i+1][n] == 1:
-                        v2_original[i+1].append(1)
-                    else:
-                        v2_original[i+1].append(0)
-                else:
-                    if switchdict[i+1][n] == 1:
-                        v3_original[i+1].append(1)
-                    else:
-                        v3_original[i+1].append(0)
+        # masking each graduate's K instances by career choice, keeping the switch-variable for the instances with that career
+        m1 = careerdict == 1
+        m2 = careerdict == 2
+        m3 = careerdict == 3
+        v1_original = [switchdict[i][m1[i]] for i in range(par.N)]
+        v2_original = [switchdict[i][m2[i]] for i in range(par.N)]
+        v3_original = [switchdict[i][m3[i]] for i in range(par.N)]
 
         return v1_original, v2_original, v3_original
 
-def count(list):
+def count(arr):
     '''This function counts the share of times the number 1, 2 or 3 appears in a list'''
-    count1 = 0
-    count2 = 0
-    count3 = 0
-    for element in list:
-        if element == 1:
-            count1 += 1
-        elif element == 2:
-            count2 += 1
-        else:
-            count3 += 1
-
-    v1 = count1/len(list)
-    v2 = count2/len(list)
-    v3 = count3/len(list)
-    
-    h = [v1, v2, v3]
+    arr = np.asarray(arr, dtype=np.intp)
+    # counting the occurrences of each career in one pass, where index j holds the count of career j
+    c = np.bincount(arr, minlength=4)
+    h = (c[1:4] / arr.size).tolist()
     return h
 
-def plot_career(C1,C2,C3,C4,C5,C6,C7,C8,C9,C10):
+def plot_career(*Cs):
     '''This function plots the shares of the different career choices for i = 1,2,...,10'''
 
+    # stacking the shares into one array with a row for each i and a column for each career
+    data = np.stack(Cs)
+
     # plotting the 10 graphs for the shares of the different career choices
     fig, axs = plt.subplots(nrows=5, ncols=2, figsize=(12, 20), dpi=100, constrained_layout=True)
     fig.suptitle('Figure 2.1: Distribution of career choices for i = 1,...,10', fontsize=16)
     labels = ['v1', 'v2' , 'v3']
 
     # then, creating the individual plots for each i
-    # for i = 1:
-    axs[0][0].set_ylabel('percentage')
-    axs[0][0].bar(labels, C1, color='mediumpurple')
-    axs[0][0].set_title('i = 1')
-    axs[0][0].set_ylim(0,1)
-
-    # for i = 2:
-    axs[0][1].set_ylabel('percentage')
-    axs[0][1].bar(labels,C2, color='mediumpurple')
-    axs[0][1].set_title('i = 2')
-    axs[0][1].set_ylim(0,1)
-
-    # for i = 3:
-    axs[1][0].set_ylabel('percentage')
-    axs[1][0].bar(labels,C3, color='mediumpurple')
-    axs[1][0].set_title('i = 3')
-    axs[1][0].set_ylim(0,1)
-
-    # for i = 4:
-    axs[1][1].set_ylabel('percentage')
-    axs[1][1].bar(labels,C4, color='mediumpurple')
-    axs[1][1].set_title('i = 4')
-    axs[1][1].set_ylim(0,1)
-
-    # for i = 5:
-    axs[2][0].set_ylabel('percentage')
-    axs[2][0].bar(labels,C5, color='mediumpurple')
-    axs[2][0].set_title('i = 5')
-    axs[2][0].set_ylim(0,1)
-    
-    # for i = 6:
-    axs[2][1].set_ylabel('percentage')
-    axs[2][1].bar(labels,C6, color='mediumpurple')
-    axs[2][1].set_title('i = 6')
-    axs[2][1].set_ylim(0,1)
-
-    # for i = 7:
-    axs[3][0].set_ylabel('percentage')
-    axs[3][0].bar(labels,C7, color='mediumpurple')
-    axs[3][0].set_title('i = 7')
-    axs[3][0].set_ylim(0,1)
-    
-    # for i = 8:
-    axs[3][1].set_ylabel('percentage')
-    axs[3][1].bar(labels,C8, color='mediumpurple')
-    axs[3][1].set_title('i = 8')
-    axs[3][1].set_ylim(0,1)
-
-    # for i = 9:
-    axs[4][0].set_ylabel('percentage')
-    axs[4][0].bar(labels,C9, color='mediumpurple')
-    axs[4][0].set_title('i = 9')
-    axs[4][0].set_ylim(0,1)
-
-    # for i = 10:
-    axs[4][1].set_ylabel('percentage')
-    axs[4][1].bar(labels,C10, color='mediumpurple')
-    axs[4][1].set_title('i = 10')
-    axs[4][1].set_ylim(0,1)
+    for i, (ax, row) in enumerate(zip(axs.flat, data), start=1):
+        ax.bar(labels, row, color='mediumpurple')
+        ax.set(title=f'i = {i}', ylabel='percentage', ylim=(0,1))
 
     plt.show()
 
-def count2(list):
+def count2(arr):
     '''This function counts the share of times the number 1 appears in a list'''
-    count0 = 0
-    count1 = 0
-
-    for element in list:
-        if element == 0:
-            count0 += 1
-        else:
-            count1 += 1
-    
-    switch = count1/len(list)
+    switch = np.mean(np.asarray(arr) == 1)
     return switch
 
 def plot_switch(s_v1_original, s_v2_original, s_v3_original):